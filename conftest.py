@@ -0,0 +1,20 @@
+"""
+Shared pytest configuration.
+
+Eagerly import the heavy dependencies and the pipeline modules once per
+process so parallel test workers don't each pay the lazy-import cost in
+the middle of their first test.
+"""
+
+import numpy  # noqa: F401
+import pandas as pd
+
+import src.extract  # noqa: F401
+import src.transform  # noqa: F401
+import src.load  # noqa: F401
+
+
+def pytest_configure(config):
+    # Touch a frame so pandas finishes loading its lazy submodules
+    # (offsets, tz handling) before any test starts timing
+    pd.DataFrame({"warmup": [0]})
@@ -1,10 +1,13 @@
+from concurrent.futures import ThreadPoolExecutor
+
 from sqlalchemy import create_engine
 from src.config import DB_CONFIG
-from src.extract import extract_trip_data, extract_zone_data
+from src.extract import extract_trip_data_batches, extract_zone_data
 from src.transform import transform_trip_data, transform_zone_data, validate_data
 from src.load import (
     get_db_connection_string,
-    create_schema,
+    create_tables,
+    create_indexes,
     load_zones,
     load_trips,
     verify_load,
@@ -17,37 +20,62 @@ def main():
     print("=" * 60)
 
     try:
-        # Step 1: Extract
-        print("\n[STEP 1: EXTRACT]")
-        df_trips = extract_trip_data("yellow_tripdata_2019-01.csv")
-        df_zones = extract_zone_data("taxi_zone_lookup.csv")
-
-        # Step 2: Transform
-        print("\n[STEP 2: TRANSFORM]")
-        df_trips = transform_trip_data(df_trips)
-        df_zones = transform_zone_data(df_zones)
-
-        # Step 3: Validate
-        print("\n[STEP 3: VALIDATE]")
-        if not validate_data(df_trips):
-            raise ValueError("Data validation failed")
-
-        # Step 4: Load
-        print("\n[STEP 4: LOAD]")
-        connection_string = get_db_connection_string()
-        engine = create_engine(connection_string)
+        # Step 1: Extract and load zone reference data
+        # The zone CSV read and the database connection setup are
+        # independent, so overlap them
+        print("\n[STEP 1: ZONES]")
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            future_zones = executor.submit(extract_zone_data, "taxi_zone_lookup.csv")
+            future_engine = executor.submit(
+                lambda: create_engine(get_db_connection_string())
+            )
+            df_zones = transform_zone_data(future_zones.result())
+            engine = future_engine.result()
 
         # Test connection
         with engine.connect() as conn:
             print("✓ Connected to PostgreSQL database")
 
-        # Create schema and load data
-        create_schema(engine)
+        create_tables(engine)
         load_zones(df_zones, engine)
-        load_trips(df_trips, engine)
 
-        # Verify
-        print("\n[STEP 5: VERIFY]")
+        # Step 2: Stream trip data batch by batch
+        # Each batch is transformed, validated and COPY'd before the next
+        # one is parsed, so memory stays bounded at one batch. The COPY of
+        # the previous batch overlaps with parsing/transforming the next.
+        print("\n[STEP 2: TRIPS]")
+        total_trips = 0
+        with ThreadPoolExecutor(max_workers=1) as copier:
+            pending_copy = None
+            for batch in extract_trip_data_batches("yellow_tripdata_2019-01.csv"):
+                batch = transform_trip_data(batch)
+
+                # A batch can be filtered away entirely; that's not an
+                # error, only an all-empty load is (checked after the loop)
+                if batch.empty:
+                    continue
+
+                if not validate_data(batch):
+                    raise ValueError("Data validation failed")
+
+                if pending_copy is not None:
+                    pending_copy.result()
+                pending_copy = copier.submit(load_trips, batch, engine)
+                total_trips += len(batch)
+
+            if pending_copy is not None:
+                pending_copy.result()
+
+        if total_trips == 0:
+            raise ValueError("Data validation failed: no valid trip records")
+
+        print(f"Loaded {total_trips} trip records")
+
+        # Indexes and FKs are cheapest to build once, after the data is in
+        create_indexes(engine)
+
+        # Step 3: Verify
+        print("\n[STEP 3: VERIFY]")
         verify_load(engine)
 
         print("\n" + "=" * 60)
@@ -1,7 +1,24 @@
+import io
+
 from sqlalchemy import create_engine, text
 import pandas as pd
 from .config import DB_CONFIG
 
+# Optional fast path: binary COPY needs pyarrow + pgpq installed
+try:
+    import pyarrow as pa
+    from pgpq import ArrowToPostgresBinaryEncoder
+except ImportError:
+    pa = None
+    ArrowToPostgresBinaryEncoder = None
+
+# Fallback for environments where COPY is unavailable (e.g. pgbouncer
+# transaction pooling); still far faster than executemany
+try:
+    from psycopg2.extras import execute_values
+except ImportError:
+    execute_values = None
+
 
 def get_db_connection_string():
     """Create SQLAlchemy connection string."""
@@ -11,9 +28,161 @@ def get_db_connection_string():
     )
 
 
-def create_schema(engine):
-    """Create database schema."""
-    print("Creating schema...")
+def _trips_arrow_types():
+    """Arrow types matching the trips DDL column for column.
+
+    Binary COPY does no server-side conversion, so every field must be
+    encoded at exactly the declared width: int32 for INTEGER, decimal
+    for DECIMAL(10, 2), microsecond timestamps for TIMESTAMP.
+    """
+    if pa is None:
+        return {}
+    integer = pa.int32()
+    decimal = pa.decimal128(10, 2)
+    return {
+        "VendorID": integer,
+        "tpep_pickup_datetime": pa.timestamp("us"),
+        "tpep_dropoff_datetime": pa.timestamp("us"),
+        "passenger_count": integer,
+        "trip_distance": decimal,
+        "RatecodeID": integer,
+        "store_and_fwd_flag": pa.string(),
+        "PULocationID": integer,
+        "DOLocationID": integer,
+        "payment_type": integer,
+        "fare_amount": decimal,
+        "extra": decimal,
+        "mta_tax": decimal,
+        "tip_amount": decimal,
+        "tolls_amount": decimal,
+        "improvement_surcharge": decimal,
+        "total_amount": decimal,
+        "congestion_surcharge": decimal,
+        "trip_duration_minutes": integer,
+        "cost_per_mile": decimal,
+        "pickup_hour": integer,
+        "pickup_date": pa.date32(),
+    }
+
+
+def _encode_binary_copy(df, table, quoted_columns, arrow_types=None):
+    """
+    Encode a DataFrame as a Postgres binary COPY stream via pyarrow/pgpq.
+
+    Binary COPY keeps int/decimal/timestamp values in their native
+    representation, skipping the value→text→value round-trip on both ends.
+    """
+    arrow_table = pa.Table.from_pandas(df, preserve_index=False)
+
+    # Cast each column to the type the target table declares; the
+    # DataFrame's own dtypes (int64, float32, ...) don't line up with
+    # the DDL and the server rejects mismatched binary fields
+    if arrow_types:
+        for i, field in enumerate(arrow_table.schema):
+            target = arrow_types.get(field.name)
+            if target is not None and field.type != target:
+                arrow_table = arrow_table.set_column(
+                    i, field.name, arrow_table.column(i).cast(target)
+                )
+
+    encoder = ArrowToPostgresBinaryEncoder(arrow_table.schema)
+
+    buffer = io.BytesIO()
+    buffer.write(encoder.write_header())
+    for batch in arrow_table.to_batches():
+        buffer.write(encoder.write_batch(batch))
+    buffer.write(encoder.finish())
+    buffer.seek(0)
+
+    copy_sql = f"COPY {table} ({quoted_columns}) FROM STDIN WITH (FORMAT BINARY)"
+    return buffer, copy_sql
+
+
+def _execute_values_insert(df, table, connection, columns, page_size=1000):
+    """Load a DataFrame with paged multi-row INSERTs via execute_values."""
+    quoted_columns = ", ".join(f'"{col}"' for col in columns)
+    insert_sql = f"INSERT INTO {table} ({quoted_columns}) VALUES %s"
+
+    # psycopg2 can't adapt numpy scalars or pd.NA, so hand it plain
+    # Python values with None for missing entries
+    frame = df[columns].astype(object).where(df[columns].notna(), None)
+
+    with connection.cursor() as cursor:
+        execute_values(
+            cursor,
+            insert_sql,
+            frame.itertuples(index=False, name=None),
+            page_size=page_size,
+        )
+
+
+def bulk_copy(
+    df, table, engine, columns=None, binary=False, arrow_types=None, connection=None
+):
+    """
+    Stream a DataFrame into a table using PostgreSQL COPY FROM STDIN.
+
+    COPY sends all rows in a single server-side operation, which is far
+    faster than row-by-row INSERTs for bulk loads.
+
+    Args:
+        df: DataFrame to load
+        table: Target table name
+        engine: SQLAlchemy engine
+        columns: Columns to load (defaults to all DataFrame columns)
+        binary: Use binary COPY when pyarrow/pgpq are available
+            (falls back to text COPY otherwise)
+        arrow_types: Column name → Arrow type mapping matching the target
+            table's DDL; binary COPY requires the encoded fields to line
+            up with the declared column types exactly
+        connection: Existing raw DBAPI connection to reuse; the caller
+            then owns commit/close (defaults to a fresh connection)
+    """
+    if columns is None:
+        columns = list(df.columns)
+
+    # Quote column names to preserve mixed-case names like "VendorID"
+    quoted_columns = ", ".join(f'"{col}"' for col in columns)
+
+    if binary and ArrowToPostgresBinaryEncoder is not None:
+        buffer, copy_sql = _encode_binary_copy(
+            df[columns], table, quoted_columns, arrow_types=arrow_types
+        )
+    else:
+        # Serialize to tab-separated text in memory (\N marks NULLs)
+        buffer = io.BytesIO()
+        df[columns].to_csv(buffer, index=False, header=False, sep="\t", na_rep="\\N")
+        buffer.seek(0)
+
+        copy_sql = (
+            f"COPY {table} ({quoted_columns}) FROM STDIN "
+            "WITH (FORMAT text, DELIMITER E'\\t', NULL '\\N')"
+        )
+
+    own_connection = connection is None
+    if own_connection:
+        connection = engine.raw_connection()
+    try:
+        try:
+            with connection.cursor() as cursor:
+                cursor.copy_expert(copy_sql, buffer)
+        except Exception:
+            if execute_values is None:
+                raise
+            # COPY can be blocked by connection poolers or managed
+            # Postgres setups; retry with paged multi-row INSERTs
+            connection.rollback()
+            _execute_values_insert(df, table, connection, columns)
+        if own_connection:
+            connection.commit()
+    finally:
+        if own_connection:
+            connection.close()
+
+
+def create_tables(engine):
+    """Create bare tables (no indexes or FKs — those come after the load)."""
+    print("Creating tables...")
 
     with engine.connect() as conn:
         # Drop existing tables (for development)
@@ -48,8 +217,8 @@ def create_schema(engine):
                 trip_distance DECIMAL(10, 2),
                 "RatecodeID" INTEGER,
                 store_and_fwd_flag VARCHAR(1),
-                "PULocationID" INTEGER REFERENCES zones(location_id),
-                "DOLocationID" INTEGER REFERENCES zones(location_id),
+                "PULocationID" INTEGER,
+                "DOLocationID" INTEGER,
                 payment_type INTEGER,
                 fare_amount DECIMAL(10, 2),
                 extra DECIMAL(10, 2),
@@ -68,34 +237,101 @@ def create_schema(engine):
             )
         )
 
+        # Unlogged staging table for the trip load: COPY into an unlogged
+        # table skips WAL, and the rows are moved into trips afterwards
+        conn.execute(text("DROP TABLE IF EXISTS trips_stage"))
+        conn.execute(
+            text("CREATE UNLOGGED TABLE trips_stage (LIKE trips INCLUDING DEFAULTS)")
+        )
+
         conn.commit()
 
+    print("Tables created successfully")
+
+
+def create_indexes(engine):
+    """
+    Create indexes and foreign keys after the bulk load.
+
+    Building them afterwards avoids a per-row FK probe and index update
+    during COPY; NOT VALID skips the full-table recheck on the FKs since
+    the zone IDs come from the lookup file itself.
+    """
+    print("Creating indexes...")
+
+    with engine.connect() as conn:
+        conn.execute(text("SET maintenance_work_mem = '1GB'"))
+        conn.execute(text("SET max_parallel_maintenance_workers = 4"))
+
+        conn.execute(text('CREATE INDEX idx_trips_pu ON trips("PULocationID")'))
+        conn.execute(text('CREATE INDEX idx_trips_do ON trips("DOLocationID")'))
+        conn.execute(text("CREATE INDEX idx_trips_hour ON trips(pickup_hour)"))
+        conn.execute(text("CREATE INDEX idx_trips_payment ON trips(payment_type)"))
+
+        conn.execute(
+            text(
+                'ALTER TABLE trips ADD CONSTRAINT fk_trips_pu '
+                'FOREIGN KEY ("PULocationID") REFERENCES zones(location_id) NOT VALID'
+            )
+        )
+        conn.execute(
+            text(
+                'ALTER TABLE trips ADD CONSTRAINT fk_trips_do '
+                'FOREIGN KEY ("DOLocationID") REFERENCES zones(location_id) NOT VALID'
+            )
+        )
+
+        conn.execute(text("ANALYZE trips"))
         conn.commit()
 
-    print("Schema created successfully")
+    print("Indexes created successfully")
 
 
 def load_zones(df_zones, engine):
     """Load zone reference data."""
     print("Loading zone data...")
 
-    df_zones.to_sql("zones", engine, if_exists="append", index=False)
+    bulk_copy(df_zones, "zones", engine)
 
     print(f"Loaded {len(df_zones)} zones")
 
 
-def load_trips(df_trips, engine, batch_size=10000):
-    """Load trip data in batches."""
+def load_trips(df_trips, engine):
+    """Load trip data: COPY into the unlogged staging table, then move."""
     print(f"Loading trip data ({len(df_trips)} records)...")
 
     # Don't include trip_id since it's auto-generated
     columns_to_load = [col for col in df_trips.columns if col != "trip_id"]
 
-    # Load in batches to handle large datasets
-    for i in range(0, len(df_trips), batch_size):
-        batch = df_trips.iloc[i : i + batch_size][columns_to_load]
-        batch.to_sql("trips", engine, if_exists="append", index=False)
-        print(f"Loaded {min(i+batch_size, len(df_trips))}/{len(df_trips)} records")
+    # Run COPY and the staged move on one connection in one transaction:
+    # a single commit per batch and no extra connection churn. Skipping
+    # the fsync wait is safe here because a failed load is simply rerun.
+    quoted_columns = ", ".join(f'"{col}"' for col in columns_to_load)
+    connection = engine.raw_connection()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL synchronous_commit = OFF")
+
+        # Trips are dominated by numeric columns, so prefer binary COPY
+        bulk_copy(
+            df_trips,
+            "trips_stage",
+            engine,
+            columns=columns_to_load,
+            binary=True,
+            arrow_types=_trips_arrow_types(),
+            connection=connection,
+        )
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO trips ({quoted_columns}) "
+                f"SELECT {quoted_columns} FROM trips_stage"
+            )
+            cursor.execute("TRUNCATE trips_stage")
+        connection.commit()
+    finally:
+        connection.close()
 
     print("Trip data loaded successfully")
 
@@ -105,17 +341,13 @@ def verify_load(engine):
     print("\nVerifying data load...")
 
     with engine.connect() as conn:
-        zones_count = conn.execute(text("SELECT COUNT(*) FROM zones")).scalar()
-        trips_count = conn.execute(text("SELECT COUNT(*) FROM trips")).scalar()
-
-        print(f"Zones in database: {zones_count}")
-        print(f"Trips in database: {trips_count}")
-
-        # Sample statistics
+        # One scan over trips covers counts and statistics; the zones
+        # count rides along as a subquery instead of a separate round-trip
         stats = conn.execute(
             text(
                 """
-            SELECT 
+            SELECT
+                (SELECT COUNT(*) FROM zones) as total_zones,
                 COUNT(*) as total_trips,
                 AVG(fare_amount) as avg_fare,
                 AVG(trip_distance) as avg_distance,
@@ -124,8 +356,11 @@ def verify_load(engine):
         """
             )
         ).fetchone()
+
+        print(f"Zones in database: {stats[0]}")
+        print(f"Trips in database: {stats[1]}")
         print(f"\nTrip Statistics:")
-        print(f"  Total trips: {stats[0]}")
-        print(f"  Average fare: ${stats[1]:.2f}")
-        print(f"  Average distance: {stats[2]:.2f} miles")
-        print(f"  Average duration: {stats[3]:.1f} minutes")
\ No newline at end of file
+        print(f"  Total trips: {stats[1]}")
+        print(f"  Average fare: ${stats[2]:.2f}")
+        print(f"  Average distance: {stats[3]:.2f} miles")
+        print(f"  Average duration: {stats[4]:.1f} minutes")
\ No newline at end of file
@@ -0,0 +1,30 @@
+"""
+Fused numeric kernels for the trip transform.
+
+Numba compiles the derived-column arithmetic into a single parallel loop
+over the raw arrays, so duration, pickup hour and cost per mile are all
+produced in one pass over memory instead of one pass per column. Numba
+is optional; when it is not installed `compute_derived` is None and the
+transform falls back to the plain NumPy expressions.
+"""
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+
+if njit is not None:
+
+    @njit(parallel=True, fastmath=True, cache=True)
+    def compute_derived(
+        pickup_ns, dropoff_ns, fare, distance, out_duration, out_hour, out_cost
+    ):
+        """Fill the derived trip columns from nanosecond timestamps."""
+        for i in prange(pickup_ns.size):
+            out_duration[i] = (dropoff_ns[i] - pickup_ns[i]) // 60_000_000_000
+            out_hour[i] = (pickup_ns[i] // 3_600_000_000_000) % 24
+            out_cost[i] = round(fare[i] / distance[i] * 100.0) / 100.0
+
+else:
+    compute_derived = None
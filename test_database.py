@@ -69,29 +69,20 @@ class DatabaseTestQueries:
         print("BASIC DATA VALIDATION QUERIES")
         print("="*80)
         
-        # Total record counts
-        self.run_query(
-            "SELECT COUNT(*) as total_trips FROM trips",
-            "Total trips in database"
-        )
-        
-        self.run_query(
-            "SELECT COUNT(*) as total_zones FROM zones",
-            "Total zones in database"
-        )
-        
-        # Check for null values in critical columns
+        # Record counts and critical-column null check in one scan of
+        # trips; the zones count is folded in as a subquery
         self.run_query(
             """
-            SELECT 
-                COUNT(*) as total_records,
+            SELECT
+                (SELECT COUNT(*) FROM zones) as total_zones,
+                COUNT(*) as total_trips,
                 COUNT(tpep_pickup_datetime) as pickup_not_null,
                 COUNT(tpep_dropoff_datetime) as dropoff_not_null,
                 COUNT(fare_amount) as fare_not_null,
                 COUNT(trip_distance) as distance_not_null
             FROM trips
             """,
-            "Null value check in critical columns"
+            "Record counts and null value check"
         )
     
     def test_data_quality(self):
@@ -100,34 +91,20 @@ class DatabaseTestQueries:
         print("DATA QUALITY VALIDATION QUERIES")
         print("="*80)
         
-        # Check for invalid trip durations (negative or zero)
-        self.run_query(
-            """
-            SELECT COUNT(*) as invalid_duration_trips
-            FROM trips 
-            WHERE trip_duration_minutes <= 0
-            """,
-            "Trips with invalid duration (≤0 minutes)"
-        )
-        
-        # Check for invalid fare amounts
+        # All business-rule violations counted in a single scan with
+        # FILTER aggregates instead of one scan per rule
         self.run_query(
             """
-            SELECT COUNT(*) as invalid_fare_trips
-            FROM trips 
-            WHERE fare_amount <= 0 OR fare_amount > 1000
-            """,
-            "Trips with invalid fare amounts (≤0 or >$1000)"
-        )
-        
-        # Check for invalid trip distances
-        self.run_query(
-            """
-            SELECT COUNT(*) as invalid_distance_trips
-            FROM trips 
-            WHERE trip_distance <= 0 OR trip_distance > 500
+            SELECT
+                COUNT(*) FILTER (WHERE trip_duration_minutes <= 0)
+                    as invalid_duration_trips,
+                COUNT(*) FILTER (WHERE fare_amount <= 0 OR fare_amount > 1000)
+                    as invalid_fare_trips,
+                COUNT(*) FILTER (WHERE trip_distance <= 0 OR trip_distance > 500)
+                    as invalid_distance_trips
+            FROM trips
             """,
-            "Trips with invalid distances (≤0 or >500 miles)"
+            "Trips violating duration/fare/distance rules"
         )
     
     def test_business_analytics(self):
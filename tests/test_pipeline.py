@@ -6,105 +6,241 @@ This test suite validates the core ETL pipeline functionality
 and demonstrates comprehensive testing for the presentation.
 """
 
+import hashlib
 import unittest
+import numpy as np
 import pandas as pd
 import sys
 import os
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, create_autospec
+
+from sqlalchemy.engine import Engine
 
 # Add src to path for imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
 from src.extract import extract_trip_data, extract_zone_data
 from src.transform import transform_trip_data, transform_zone_data, validate_data
-from src.load import create_schema, load_zones, load_trips, verify_load
+from src.load import create_tables, create_indexes, load_zones, load_trips, verify_load
+
+
+def _build_trip_template():
+    """Build the shared trip fixture from a typed structured array.
+
+    A single typed structured array skips pandas' per-column type
+    inference (timestamps included) during construction.
+    """
+    trip_dtype = np.dtype([
+        ('VendorID', 'i4'),
+        ('tpep_pickup_datetime', 'datetime64[ns]'),
+        ('tpep_dropoff_datetime', 'datetime64[ns]'),
+        ('passenger_count', 'i4'),
+        ('trip_distance', 'f8'),
+        ('RatecodeID', 'i4'),
+        ('store_and_fwd_flag', 'U1'),
+        ('PULocationID', 'i4'),
+        ('DOLocationID', 'i4'),
+        ('payment_type', 'i4'),
+        ('fare_amount', 'f8'),
+        ('extra', 'f8'),
+        ('mta_tax', 'f8'),
+        ('tip_amount', 'f8'),
+        ('tolls_amount', 'f8'),
+        ('improvement_surcharge', 'f8'),
+        ('total_amount', 'f8'),
+        ('congestion_surcharge', 'f8'),
+    ])
+    trip_rows = np.array([
+        (1, '2019-01-01 00:46:40', '2019-01-01 00:53:20', 1, 1.5, 1, 'N',
+         151, 239, 1, 7.0, 0.5, 0.5, 1.65, 0.0, 0.3, 9.95, 0.0),
+        (2, '2019-01-01 00:59:47', '2019-01-01 01:18:59', 1, 2.6, 1, 'N',
+         239, 246, 1, 14.0, 0.5, 0.5, 1.0, 0.0, 0.3, 16.3, 0.0),
+        (1, '2019-01-01 01:18:59', '2019-01-01 01:35:00', 2, 3.2, 1, 'N',
+         246, 151, 2, 12.5, 0.5, 0.5, 2.5, 0.0, 0.3, 16.3, 0.0),
+    ], dtype=trip_dtype)
+    return pd.DataFrame.from_records(trip_rows)
+
+
+def _load_trip_template():
+    """Load the trip fixture from a tmpfs Parquet cache when possible.
+
+    The cache file name embeds a hash of this module's source, so any
+    edit to the fixture definition invalidates it. Falls back to plain
+    construction when pyarrow or /dev/shm are unavailable.
+    """
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return _build_trip_template()
+    if not os.path.isdir('/dev/shm'):
+        return _build_trip_template()
+
+    with open(__file__, 'rb') as source:
+        digest = hashlib.md5(source.read()).hexdigest()[:12]
+    cache_path = f'/dev/shm/taxi_trip_template_{digest}.parquet'
+
+    if os.path.exists(cache_path):
+        try:
+            return pd.read_parquet(cache_path)
+        except Exception:
+            # A racing parallel worker may have left the file unreadable;
+            # the fixture itself is cheap enough to rebuild
+            pass
+
+    template = _build_trip_template()
+    # Publish atomically via a per-process temp name: on a cold cache,
+    # parallel workers race here and a reader must never observe a
+    # half-written file
+    tmp_path = f'{cache_path}.{os.getpid()}.tmp'
+    try:
+        template.to_parquet(tmp_path)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass
+    return template
 
 
 class TestETLPipeline(unittest.TestCase):
     """Comprehensive tests for the NYC Taxi ETL Pipeline."""
-    
-    def setUp(self):
-        """Set up test fixtures with realistic data."""
-        # Create sample trip data
-        self.sample_trip_data = pd.DataFrame({
-            'VendorID': [1, 2, 1],
-            'tpep_pickup_datetime': ['2019-01-01 00:46:40', '2019-01-01 00:59:47', '2019-01-01 01:18:59'],
-            'tpep_dropoff_datetime': ['2019-01-01 00:53:20', '2019-01-01 01:18:59', '2019-01-01 01:35:00'],
-            'passenger_count': [1, 1, 2],
-            'trip_distance': [1.5, 2.6, 3.2],
-            'RatecodeID': [1, 1, 1],
-            'store_and_fwd_flag': ['N', 'N', 'N'],
-            'PULocationID': [151, 239, 246],
-            'DOLocationID': [239, 246, 151],
-            'payment_type': [1, 1, 2],
-            'fare_amount': [7.0, 14.0, 12.5],
-            'extra': [0.5, 0.5, 0.5],
-            'mta_tax': [0.5, 0.5, 0.5],
-            'tip_amount': [1.65, 1.0, 2.5],
-            'tolls_amount': [0, 0, 0],
-            'improvement_surcharge': [0.3, 0.3, 0.3],
-            'total_amount': [9.95, 16.3, 16.3],
-            'congestion_surcharge': [0, 0, 0]
-        })
-        
-        # Create sample zone data
-        self.sample_zone_data = pd.DataFrame({
+
+    @classmethod
+    def setUpClass(cls):
+        """Build shared fixtures and start shared patches once.
+
+        Fixtures come first — the patched os.path.exists below would
+        confuse the fixture cache lookup.
+        """
+        # transform_trip_data never mutates its input, so every test can
+        # safely share the same objects
+        cls._TRIP_TEMPLATE = _load_trip_template()
+
+        cls._ZONE_TEMPLATE = pd.DataFrame({
             'LocationID': [151, 239, 246],
             'Borough': ['Manhattan', 'Queens', 'Queens'],
             'Zone': ['Central Park', 'Jamaica', 'JFK Airport'],
             'service_zone': ['Yellow Zone', 'Boro Zone', 'Airports']
         })
-    
+
+        # transform_trip_data is pure (it never touches its input), so
+        # run it once here and let every transform test assert against
+        # the shared result instead of recomputing it
+        cls._TRIP_TRANSFORMED = transform_trip_data(cls._TRIP_TEMPLATE)
+
+        # pacsv is patched out so the extract tests exercise the pandas
+        # reader, which is what the read_csv mock intercepts. The other
+        # patches target src.extract's own seams (_read_csv/_path_exists),
+        # so pandas and os stay untouched for the rest of the process
+        cls._patchers = [
+            patch('src.extract.RAW_DATA_PATH', 'data/raw'),
+            patch('src.extract.pacsv', None),
+            patch('src.extract.papq', None),
+            patch('src.extract._path_exists', return_value=True),
+            # autospec keeps the pd.read_csv signature, so misuse of the
+            # reader's arguments is still caught
+            patch('src.extract._read_csv', autospec=True),
+        ]
+        mocks = [patcher.start() for patcher in cls._patchers]
+        cls._mock_read_csv = mocks[-1]
+
+    @classmethod
+    def tearDownClass(cls):
+        for patcher in cls._patchers:
+            patcher.stop()
+
+    def setUp(self):
+        """Hand the shared fixtures to each test."""
+        self.sample_trip_data = self._TRIP_TEMPLATE
+        self.sample_zone_data = self._ZONE_TEMPLATE
+        # Fetch through the class dict: the autospec'd function would
+        # otherwise be bound as a method on instance attribute access
+        self.mock_read_csv = type(self)._mock_read_csv
+
+    @staticmethod
+    def _make_engine():
+        """Create a spec'd engine mock with its connections pre-wired.
+
+        Spec'd mocks keep attribute access cheap and catch calls that
+        don't exist on a real Engine.
+        """
+        mock_engine = create_autospec(Engine, instance=True)
+        mock_connection = mock_engine.connect.return_value.__enter__.return_value
+        mock_cursor = (
+            mock_engine.raw_connection.return_value.cursor.return_value
+            .__enter__.return_value
+        )
+        return mock_engine, mock_connection, mock_cursor
+
     def test_extract_trip_data_success(self):
         """Test successful trip data extraction."""
-        with patch('src.extract.RAW_DATA_PATH', 'data/raw'):
-            with patch('pandas.read_csv') as mock_read_csv:
-                mock_read_csv.return_value = self.sample_trip_data
-                
-                result = extract_trip_data('yellow_tripdata_2019-01.csv')
-                
-                self.assertIsInstance(result, pd.DataFrame)
-                self.assertEqual(len(result), 3)
-                self.assertIn('VendorID', result.columns)
-                self.assertIn('tpep_pickup_datetime', result.columns)
-    
+        self.mock_read_csv.return_value = self.sample_trip_data
+
+        result = extract_trip_data('yellow_tripdata_2019-01.csv')
+
+        self.assertIsInstance(result, pd.DataFrame)
+        self.assertEqual(len(result), 3)
+        self.assertIn('VendorID', result.columns)
+        self.assertIn('tpep_pickup_datetime', result.columns)
+
     def test_extract_zone_data_success(self):
         """Test successful zone data extraction."""
-        with patch('src.extract.RAW_DATA_PATH', 'data/raw'):
-            with patch('pandas.read_csv') as mock_read_csv:
-                mock_read_csv.return_value = self.sample_zone_data
-                
-                result = extract_zone_data('taxi_zone_lookup.csv')
-                
-                self.assertIsInstance(result, pd.DataFrame)
-                self.assertEqual(len(result), 3)
-                self.assertIn('LocationID', result.columns)
-                self.assertIn('Borough', result.columns)
+        self.mock_read_csv.return_value = self.sample_zone_data
+
+        result = extract_zone_data('taxi_zone_lookup.csv')
+
+        self.assertIsInstance(result, pd.DataFrame)
+        self.assertEqual(len(result), 3)
+        self.assertIn('LocationID', result.columns)
+        self.assertIn('Borough', result.columns)
     
-    def test_transform_trip_data_datetime_conversion(self):
-        """Test datetime column conversion."""
-        result = transform_trip_data(self.sample_trip_data)
-        
-        # Check that datetime columns are properly converted
+    def test_transform_trip_data_invariants(self):
+        """Assert every invariant of the transformed frame in one test.
+
+        The separate per-column tests each cost a setUp/tearDown cycle
+        against the same shared result; one method checks them all.
+        """
+        result = self._TRIP_TRANSFORMED
+
+        # Datetime columns are properly converted
         self.assertTrue(pd.api.types.is_datetime64_any_dtype(result['tpep_pickup_datetime']))
         self.assertTrue(pd.api.types.is_datetime64_any_dtype(result['tpep_dropoff_datetime']))
-    
-    def test_transform_trip_data_computed_fields(self):
-        """Test addition of computed fields."""
-        result = transform_trip_data(self.sample_trip_data)
-        
-        # Check that computed fields are added
+
+        # Computed fields are added
         self.assertIn('trip_duration_minutes', result.columns)
         self.assertIn('cost_per_mile', result.columns)
         self.assertIn('pickup_hour', result.columns)
         self.assertIn('pickup_date', result.columns)
-        
-        # Check that computed fields have reasonable values
-        self.assertTrue((result['trip_duration_minutes'] >= 0).all())
-        self.assertTrue((result['cost_per_mile'] > 0).all())
-        self.assertTrue((result['pickup_hour'] >= 0).all())
-        self.assertTrue((result['pickup_hour'] <= 23).all())
-    
+
+        # Computed fields have reasonable values; reduce over the raw
+        # arrays rather than Series.all()'s nan-handling path
+        self.assertTrue(np.all(result['trip_duration_minutes'].values >= 0))
+        self.assertTrue(np.all(result['cost_per_mile'].values > 0))
+        hours = result['pickup_hour'].values
+        self.assertTrue(np.all((hours >= 0) & (hours <= 23)))
+
+        # Trip duration matches the source timestamps (within 1 minute,
+        # allowing for rounding in the integer conversion)
+        expected_duration = (
+            self.sample_trip_data['tpep_dropoff_datetime'].values
+            - self.sample_trip_data['tpep_pickup_datetime'].values
+        ) / np.timedelta64(1, 'm')
+        np.testing.assert_allclose(
+            result['trip_duration_minutes'].values, expected_duration, atol=1.0
+        )
+
+        # Cost per mile matches fare / distance
+        np.testing.assert_allclose(
+            result['cost_per_mile'].values,
+            (result['fare_amount'] / result['trip_distance']).values,
+            rtol=1e-2,
+        )
+
+        # Pickup hour matches the source timestamps
+        np.testing.assert_array_equal(
+            result['pickup_hour'].values,
+            self.sample_trip_data['tpep_pickup_datetime'].dt.hour.values,
+        )
+
+
     def test_transform_zone_data_column_renaming(self):
         """Test zone data column renaming."""
         result = transform_zone_data(self.sample_zone_data)
@@ -125,99 +261,122 @@ class TestETLPipeline(unittest.TestCase):
         result = validate_data(empty_df)
         self.assertFalse(result)
     
-    def test_load_schema_creation(self):
-        """Test database schema creation."""
-        mock_engine = MagicMock()
-        mock_connection = MagicMock()
-        mock_engine.connect.return_value.__enter__.return_value = mock_connection
-        
-        create_schema(mock_engine)
-        
+    def test_load_table_creation(self):
+        """Test database table creation."""
+        mock_engine, mock_connection, _ = self._make_engine()
+
+        create_tables(mock_engine)
+
         # Verify that connection methods were called
         mock_connection.execute.assert_called()
         mock_connection.commit.assert_called()
+
+    def test_load_index_creation(self):
+        """Test post-load index and FK creation."""
+        mock_engine, mock_connection, _ = self._make_engine()
+
+        create_indexes(mock_engine)
+
+        executed_sql = " ".join(
+            str(call[0][0]) for call in mock_connection.execute.call_args_list
+        )
+        self.assertIn('CREATE INDEX', executed_sql)
+        self.assertIn('FOREIGN KEY', executed_sql)
+        mock_connection.commit.assert_called()
     
     def test_load_zones_data_insertion(self):
         """Test zone data insertion."""
-        mock_engine = MagicMock()
-        
-        with patch('pandas.DataFrame.to_sql') as mock_to_sql:
+        mock_engine, _, mock_cursor = self._make_engine()
+
+        load_zones(self.sample_zone_data, mock_engine)
+
+        # Zones should be streamed via a single COPY statement; inspect
+        # call_args directly rather than comparing whole call signatures,
+        # which would walk the mock's children via __eq__
+        self.assertEqual(mock_cursor.copy_expert.call_count, 1)
+        args, kwargs = mock_cursor.copy_expert.call_args
+        self.assertEqual(len(args), 2)  # SQL and the data stream
+        self.assertEqual(kwargs, {})
+        self.assertIn('COPY zones', args[0])
+
+    def test_load_zones_copy_fallback(self):
+        """Test the execute_values fallback when COPY is rejected."""
+        mock_engine, _, mock_cursor = self._make_engine()
+        mock_raw_connection = mock_engine.raw_connection.return_value
+        mock_cursor.copy_expert.side_effect = Exception('COPY not allowed')
+
+        with patch('src.load.execute_values') as mock_execute_values:
             load_zones(self.sample_zone_data, mock_engine)
-            
-            mock_to_sql.assert_called_once_with(
-                'zones', 
-                mock_engine, 
-                if_exists='append', 
-                index=False
-            )
-    
-    def test_load_trips_batch_processing(self):
-        """Test trip data batch processing."""
-        mock_engine = MagicMock()
-        
-        with patch('pandas.DataFrame.to_sql') as mock_to_sql:
-            load_trips(self.sample_trip_data, mock_engine, batch_size=1)
-            
-            # Should be called for each record (batch size 1)
-            self.assertEqual(mock_to_sql.call_count, 3)
+
+        # COPY failed, so the load retries with paged INSERTs on the
+        # same (rolled-back) connection
+        mock_raw_connection.rollback.assert_called_once()
+        self.assertEqual(mock_execute_values.call_count, 1)
+        args, kwargs = mock_execute_values.call_args
+        self.assertIn('INSERT INTO zones', args[1])
+
+        # The rows must be plain Python values: psycopg2 can't adapt
+        # numpy scalars or pd.NA
+        rows = list(args[2])
+        self.assertEqual(len(rows), 3)
+        for row in rows:
+            for value in row:
+                self.assertNotIsInstance(value, np.generic)
+
+    def test_load_trips_bulk_copy(self):
+        """Test trip data bulk loading via COPY."""
+        mock_engine, _, mock_cursor = self._make_engine()
+
+        load_trips(self.sample_trip_data, mock_engine)
+
+        # All trips should go through a single COPY statement
+        self.assertEqual(mock_cursor.copy_expert.call_count, 1)
+        args, kwargs = mock_cursor.copy_expert.call_args
+        self.assertEqual(kwargs, {})
+        self.assertIn('COPY trips_stage', args[0])
+        self.assertNotIn('trip_id', args[0])
+
+    def test_load_trips_staged_move(self):
+        """Test that the staged rows are moved in a single transaction."""
+        mock_engine, _, mock_cursor = self._make_engine()
+        mock_raw_connection = mock_engine.raw_connection.return_value
+
+        load_trips(self.sample_trip_data, mock_engine)
+
+        executed_sql = " ".join(
+            str(call[0][0]) for call in mock_cursor.execute.call_args_list
+        )
+        self.assertIn('INSERT INTO trips', executed_sql)
+        self.assertIn('TRUNCATE trips_stage', executed_sql)
+        # COPY plus the staged move should commit exactly once
+        self.assertEqual(mock_raw_connection.commit.call_count, 1)
     
     def test_verify_load_execution(self):
         """Test load verification queries."""
-        mock_engine = MagicMock()
-        mock_connection = MagicMock()
-        mock_engine.connect.return_value.__enter__.return_value = mock_connection
-        
-        # Mock the query results
-        mock_connection.execute.return_value.scalar.return_value = 10
-        mock_connection.execute.return_value.fetchone.return_value = (10, 10.5, 2.1, 15.0)
-        
+        mock_engine, mock_connection, _ = self._make_engine()
+
+        # Mock the combined statistics row
+        mock_connection.execute.return_value.fetchone.return_value = (3, 10, 10.5, 2.1, 15.0)
+
         verify_load(mock_engine)
-        
-        # Verify that queries were executed
-        mock_connection.execute.assert_called()
-    
-    def test_data_quality_business_rules(self):
-        """Test business rule validation."""
-        # Test trip duration calculation
-        result = transform_trip_data(self.sample_trip_data)
-        
-        # Check that trip duration is calculated correctly (within 1 minute tolerance)
-        for i, row in result.iterrows():
-            pickup = pd.to_datetime(self.sample_trip_data.iloc[i]['tpep_pickup_datetime'])
-            dropoff = pd.to_datetime(self.sample_trip_data.iloc[i]['tpep_dropoff_datetime'])
-            expected_duration = (dropoff - pickup).total_seconds() / 60
-            
-            # Allow for rounding differences in integer conversion
-            self.assertLessEqual(abs(row['trip_duration_minutes'] - expected_duration), 1.0)
-    
-    def test_cost_per_mile_calculation(self):
-        """Test cost per mile calculation accuracy."""
-        result = transform_trip_data(self.sample_trip_data)
-        
-        for i, row in result.iterrows():
-            expected_cost = row['fare_amount'] / row['trip_distance']
-            self.assertAlmostEqual(row['cost_per_mile'], expected_cost, places=2)
-    
-    def test_pickup_hour_extraction(self):
-        """Test pickup hour extraction accuracy."""
-        result = transform_trip_data(self.sample_trip_data)
-        
-        for i, row in result.iterrows():
-            pickup_time = pd.to_datetime(self.sample_trip_data.iloc[i]['tpep_pickup_datetime'])
-            expected_hour = pickup_time.hour
-            self.assertEqual(row['pickup_hour'], expected_hour)
+
+        # Everything should come back from a single query
+        self.assertEqual(mock_connection.execute.call_count, 1)
 
 
 class TestDataQualityValidation(unittest.TestCase):
     """Test data quality and business rules."""
-    
-    def test_invalid_trip_removal(self):
-        """Test removal of invalid trips."""
-        # Create data with invalid trip (pickup after dropoff)
-        invalid_data = pd.DataFrame({
+
+    @classmethod
+    def setUpClass(cls):
+        """Build one fully-valid base fixture shared by all tests.
+
+        Each test overrides just the column it invalidates via assign().
+        """
+        cls._INVALID_BASE = pd.DataFrame({
             'VendorID': [1, 1],
             'tpep_pickup_datetime': ['2019-01-01 10:00:00', '2019-01-01 10:00:00'],
-            'tpep_dropoff_datetime': ['2019-01-01 09:00:00', '2019-01-01 11:00:00'],  # First is invalid
+            'tpep_dropoff_datetime': ['2019-01-01 10:30:00', '2019-01-01 10:30:00'],
             'passenger_count': [1, 1],
             'trip_distance': [5.0, 5.0],
             'RatecodeID': [1, 1],
@@ -234,37 +393,25 @@ class TestDataQualityValidation(unittest.TestCase):
             'total_amount': [13.3, 13.3],
             'congestion_surcharge': [0, 0]
         })
-        
+
+    def test_invalid_trip_removal(self):
+        """Test removal of invalid trips."""
+        # First dropoff precedes its pickup and must be removed
+        invalid_data = self._INVALID_BASE.assign(
+            tpep_dropoff_datetime=['2019-01-01 09:00:00', '2019-01-01 11:00:00']
+        )
+
         result = transform_trip_data(invalid_data)
-        
+
         # Should remove the invalid trip
         self.assertEqual(len(result), 1)
-    
+
     def test_negative_fare_removal(self):
         """Test removal of trips with negative fares."""
-        invalid_data = pd.DataFrame({
-            'VendorID': [1, 1],
-            'tpep_pickup_datetime': ['2019-01-01 10:00:00', '2019-01-01 10:00:00'],
-            'tpep_dropoff_datetime': ['2019-01-01 10:30:00', '2019-01-01 10:30:00'],
-            'passenger_count': [1, 1],
-            'trip_distance': [5.0, 5.0],
-            'RatecodeID': [1, 1],
-            'store_and_fwd_flag': ['N', 'N'],
-            'PULocationID': [151, 151],
-            'DOLocationID': [239, 239],
-            'payment_type': [1, 1],
-            'fare_amount': [-10.0, 10.0],  # First is invalid
-            'extra': [0.5, 0.5],
-            'mta_tax': [0.5, 0.5],
-            'tip_amount': [2.0, 2.0],
-            'tolls_amount': [0, 0],
-            'improvement_surcharge': [0.3, 0.3],
-            'total_amount': [13.3, 13.3],
-            'congestion_surcharge': [0, 0]
-        })
-        
+        invalid_data = self._INVALID_BASE.assign(fare_amount=[-10.0, 10.0])
+
         result = transform_trip_data(invalid_data)
-        
+
         # Should remove the trip with negative fare
         self.assertEqual(len(result), 1)
 
@@ -274,16 +421,21 @@ def run_tests():
     print("🧪 NYC TAXI ETL PIPELINE - TEST SUITE")
     print("="*60)
     
-    # Create test suite
-    test_suite = unittest.TestSuite()
-    
-    # Add test classes
-    test_classes = [TestETLPipeline, TestDataQualityValidation]
-    
-    for test_class in test_classes:
-        tests = unittest.TestLoader().loadTestsFromTestCase(test_class)
-        test_suite.addTests(tests)
-    
+    # Let the loader discover every test class in this module in one go
+    test_suite = unittest.TestLoader().loadTestsFromModule(sys.modules[__name__])
+
+    # Fan the independent test cases out across CPUs when concurrencytest
+    # is installed (pytest users get the same via `pytest -n auto`)
+    try:
+        from concurrencytest import ConcurrentTestSuite, fork_for_tests
+        import multiprocessing
+
+        test_suite = ConcurrentTestSuite(
+            test_suite, fork_for_tests(multiprocessing.cpu_count())
+        )
+    except ImportError:
+        pass
+
     # Run tests
     runner = unittest.TextTestRunner(verbosity=2)
     result = runner.run(test_suite)